@@ -0,0 +1,50 @@
+"""schedule_cache week_start, group_id index
+
+Revision ID: 3f6c2a9d8e41
+Revises:
+Create Date: 2026-10-14 14:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3f6c2a9d8e41"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.drop_index(
+        "ix_schedule_cache_group_id_week_start",
+        table_name="schedule_cache",
+        if_exists=True,
+    )
+    op.create_index(
+        "ix_schedule_cache_week_start_group_id",
+        "schedule_cache",
+        ["week_start", "group_id"],
+        unique=False,
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_schedule_cache_week_start_group_id",
+        table_name="schedule_cache",
+        if_exists=True,
+    )
+    op.create_index(
+        "ix_schedule_cache_group_id_week_start",
+        "schedule_cache",
+        ["group_id", "week_start"],
+        unique=False,
+        if_not_exists=True,
+    )
@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from typing import List
+from zoneinfo import ZoneInfo
 
 from app.lexicon.lexicon import LEXICON_BUTTONS
 
@@ -17,6 +18,8 @@ class Settings(BaseSettings):
 
 settings = Settings()
 
+CAMPUS_TZ = ZoneInfo("Asia/Tashkent")
+
 
 async def is_admin(id: int) -> bool:
     if id in settings.ADMINS:
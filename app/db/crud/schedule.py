@@ -1,12 +1,17 @@
 from collections import defaultdict
 import json
-from datetime import date, datetime, timedelta
+from datetime import date, datetime, time, timedelta
 from typing import Optional
 import logging
 from sqlalchemy import select, update
 from app.db.database import async_session_maker
 from app.db.models import ScheduleCache, User, UserSettings
-from app.utils.schedule import get_week_start
+from app.utils.schedule import (
+    WINDOW_SECONDS,
+    add_check_windows,
+    add_lesson_date,
+    get_week_start,
+)
 
 
 async def get_cached_schedule(
@@ -110,25 +115,58 @@ async def get_students_by_group_with_digest(group_id: int) -> list[int]:
         return students
 
 
-async def get_all_group_schedules_today(target_date: date) -> dict[int, list[dict]]:
+def get_due_checks(lesson: dict, now_s: int) -> list[str]:
+    # Rows cached before the windows were precomputed get them on the fly.
+    if "checkinEndSeconds" not in lesson and "checkoutEndSeconds" not in lesson:
+        add_check_windows(lesson)
+
+    due = []
+    for action, done_field, end_field in (
+        ("entry", "checkIn", "checkinEndSeconds"),
+        ("exit", "checkOut", "checkoutEndSeconds"),
+    ):
+        if lesson.get(done_field):
+            continue
+        end_s = lesson.get(end_field)
+        if end_s is not None and end_s - WINDOW_SECONDS <= now_s <= end_s:
+            due.append(action)
+    return due
+
+
+async def get_all_group_schedules_today(
+    target_date: date, now: time
+) -> dict[int, list[dict]]:
+    week_start = get_week_start(target_date)
+
     async with async_session_maker() as session:
-        result = await session.execute(select(ScheduleCache))
+        # Lessons are stored with UTC dates (the day before), so on Mondays the
+        # current lessons may still sit in the previous week's row.
+        result = await session.execute(
+            select(ScheduleCache).where(
+                ScheduleCache.week_start.in_(
+                    (week_start, week_start - timedelta(days=7))
+                )
+            )
+        )
         rows = result.scalars().all()
 
     grouped = defaultdict(list)
     count = 0
+    now_s = now.hour * 3600 + now.minute * 60 + now.second
+    target_str = target_date.isoformat()
 
     for row in rows:
         try:
             lessons = json.loads(row.data)
             for lesson in lessons:
-                raw_date = lesson.get("scheduleDate", "")[:10]
-                # В INET стоит UTC:19:000
-                lesson_date = datetime.fromisoformat(raw_date).date() + timedelta(
-                    days=1
-                )
-                if lesson_date == target_date:
-                    grouped[row.group_id].append(lesson)
+                if lesson.get("scheduleStatus") != "ACTIVE":
+                    continue
+                if "lessonDate" not in lesson:
+                    add_lesson_date(lesson)
+                if lesson.get("lessonDate") != target_str:
+                    continue
+                for action in get_due_checks(lesson, now_s):
+                    grouped[row.group_id].append({"lesson": lesson, "type": action})
                     count += 1
         except Exception as e:
             logging.warning(
@@ -136,5 +174,5 @@ async def get_all_group_schedules_today(target_date: date) -> dict[int, list[dic
             )
             continue
 
-    logging.info(f"[Schedule] Loaded {count} lessons for {target_date}")
+    logging.info(f"[Schedule] Found {count} due lesson checks for {target_date} {now}")
     return grouped
@@ -4,6 +4,16 @@ from sqlalchemy import select, update, delete
 from app.db.models import User, UserSettings
 from app.db.database import async_session_maker
 from app.utils.encryption import encrypt, decrypt
+from app.utils.cache import BoundedCache
+
+LANGUAGE_CACHE_TTL = 3600
+LANGUAGE_CACHE_SIZE = 10_000
+
+_language_cache = BoundedCache(maxsize=LANGUAGE_CACHE_SIZE, ttl=LANGUAGE_CACHE_TTL)
+
+
+def invalidate_user_language(telegram_id: int):
+    _language_cache.pop(telegram_id)
 
 
 async def get_all_users() -> Optional[User]:
@@ -23,6 +33,10 @@ async def get_user_by_telegram_id(telegram_id: int) -> Optional[User]:
 
 
 async def get_user_language(telegram_id: int) -> str:
+    cached = _language_cache.get(telegram_id)
+    if cached is not None:
+        return cached
+
     async with async_session_maker() as session:
         result = await session.execute(
             select(UserSettings.language)
@@ -33,7 +47,9 @@ async def get_user_language(telegram_id: int) -> str:
         logging.info(
             f"[User] Getting language for telegram_id={telegram_id} → {lang or 'en'}"
         )
-        return lang or "en"
+
+    _language_cache.set(telegram_id, lang or "en")
+    return lang or "en"
 
 
 async def get_attendance_data(telegram_id: int) -> tuple[int, int]:
@@ -93,6 +109,7 @@ async def create_user_with_settings(
             f"[User] Created user telegram_id={telegram_id}, group_id={group_id}"
         )
         await session.commit()
+        invalidate_user_language(telegram_id)
 
 
 async def get_user_credentials(telegram_id: int) -> Optional[tuple[str, str]]:
@@ -131,6 +148,7 @@ async def update_user_language(telegram_id: int, lang: str) -> None:
             f"[User] Updated language to '{lang}' for telegram_id={telegram_id}"
         )
         await session.commit()
+        invalidate_user_language(telegram_id)
 
 
 async def delete_user_completely(telegram_id: int) -> bool:
@@ -153,5 +171,6 @@ async def delete_user_completely(telegram_id: int) -> bool:
         await session.execute(delete(User).where(User.id == user.id))
 
         await session.commit()
+        invalidate_user_language(telegram_id)
         logging.info(f"[User] Deleted user and settings for telegram_id={telegram_id}")
         return True
@@ -9,6 +9,7 @@ from sqlalchemy import (
     Date,
     Text,
     DateTime,
+    Index,
     func,
 )
 from sqlalchemy.orm import relationship
@@ -63,6 +64,10 @@ class ScheduleCache(Base):
     data = Column(Text, nullable=False)
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
 
+    __table_args__ = (
+        Index("ix_schedule_cache_week_start_group_id", "week_start", "group_id"),
+    )
+
 
 class SupportRequest(Base):
     __tablename__ = "support_requests"
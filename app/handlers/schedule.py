@@ -17,8 +17,10 @@ from app.utils.schedule import (
     fetch_schedule_data,
     format_schedule,
     get_week_start,
-    sanitize_schedule_data,
+    lessons_on,
+    rendered_schedules,
 )
+from app.utils.date_utils import INET_DATE_SHIFT
 from datetime import date, datetime, timedelta
 
 logger = logging.getLogger(__name__)
@@ -29,18 +31,20 @@ async def get_schedule_text(telegram_id: int, lang: str, mode: str) -> str:
     today = date.today()
     username = "Unknown"  # We'll get the username from the message context
 
-    if mode == "tomorrow":
-        target_day = today
-    elif mode == "week":
-        target_day = today if today.weekday() < 6 else today + timedelta(days=1)
+    if mode == "week":
+        lesson_day = today if today.weekday() < 6 else today + timedelta(days=1)
+        week_day = lesson_day
     else:
-        target_day = today - timedelta(days=1)
+        lesson_day = today + timedelta(days=1) if mode == "tomorrow" else today
+        # INET dates lessons a day early, so the local day's lessons sit in
+        # the INET week of the day before.
+        week_day = lesson_day - INET_DATE_SHIFT
 
-    monday = get_week_start(target_day)
+    monday = get_week_start(week_day)
     sunday = monday + timedelta(days=6)
 
     logger.info(
-        f"Getting schedule for user {telegram_id}, mode={mode}, target_day={target_day}"
+        f"Getting schedule for user {telegram_id}, mode={mode}, lesson_day={lesson_day}"
     )
 
     group_id = await get_user_group_id(telegram_id)
@@ -48,16 +52,27 @@ async def get_schedule_text(telegram_id: int, lang: str, mode: str) -> str:
         logger.warning(f"Group ID not found for user {telegram_id}")
         return LEXICON_MSG["user_not_found"][lang]
 
-    cached = None
+    render_key = (
+        group_id,
+        monday,
+        "week" if mode == "week" else lesson_day.isoformat(),
+        lang,
+    )
+
+    raw = None
     cache = await get_cached_schedule(group_id, monday)
     if cache and (datetime.utcnow() - cache.updated_at) < timedelta(hours=9):
         logger.info(
             f"Using cached schedule for group_id={group_id}, updated_at={cache.updated_at}"
         )
-        cached = json.loads(cache.data)
-
-    if cached:
-        cleaned_data = cached
+        raw = cache.data
+
+    if raw:
+        digest = rendered_schedules.digest(raw)
+        text = rendered_schedules.get(render_key, digest)
+        if text is not None:
+            return text
+        cleaned_data = json.loads(raw)
     else:
         logger.info(f"Cache miss for group_id={group_id}, fetching fresh data")
         creds = await get_user_credentials(telegram_id)
@@ -71,27 +86,24 @@ async def get_schedule_text(telegram_id: int, lang: str, mode: str) -> str:
             logger.warning(f"Failed to get token for user {telegram_id}")
             return LEXICON_MSG["inet_auth_failed"][lang]
 
-        weekly_data = await fetch_schedule_data(token, monday, sunday)
-        if not weekly_data:
+        cleaned_data = await fetch_schedule_data(token, monday, sunday)
+        if not cleaned_data:
             logger.error(f"Failed to fetch schedule data for user {telegram_id}")
             return LEXICON_MSG["unexpected_error"][lang]
 
-        cleaned_data = sanitize_schedule_data(weekly_data)
-        await save_schedule_to_cache(group_id, monday, json.dumps(cleaned_data))
+        raw = json.dumps(cleaned_data)
+        digest = rendered_schedules.digest(raw)
+        await save_schedule_to_cache(group_id, monday, raw)
         logger.info(f"Saved new schedule to cache for group_id={group_id}")
 
     if mode == "week":
-        return await format_schedule(cleaned_data, lang)
+        text = format_schedule(cleaned_data, lang)
     else:
-        filtered = [
-            item
-            for item in cleaned_data
-            if datetime.fromisoformat(
-                item["scheduleDate"].replace("+0000", "+00:00")
-            ).date()
-            == target_day
-        ]
-        return await format_schedule(filtered, lang)
+        filtered = lessons_on(cleaned_data, lesson_day)
+        text = format_schedule(filtered, lang)
+
+    rendered_schedules.set(render_key, digest, text)
+    return text
 
 
 @schedule_router.message(TextFromLexicon("schedule_today_view"))
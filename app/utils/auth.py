@@ -1,6 +1,9 @@
+import logging
 import httpx
 from typing import Tuple, Optional
-from app.config import TIMETABLE_HEADERS
+from app.utils.http import CircuitOpenError, load_json, request
+
+logger = logging.getLogger(__name__)
 
 
 async def verify_credentials(
@@ -10,33 +13,37 @@ async def verify_credentials(
     inet_id = None
 
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "https://inet.mdis.uz/oauth/tocken",
-                headers=TIMETABLE_HEADERS,
-                data={
-                    "username": login,
-                    "password": password,
-                    "grant_type": "password",
-                },
-                timeout=10,
-            )
-
-        if response.status_code == 200:
-            try:
-                res = response.json()
-                token = res.get("access_token")
-                user_info = res.get("user", {})
-                if isinstance(user_info, dict):
-                    inet_id = user_info.get("id")
-            except Exception:
-                return False, None, None
-
-            return True, token, inet_id
-
-        else:
+        response = await request(
+            "POST",
+            "https://inet.mdis.uz/oauth/tocken",
+            data={
+                "username": login,
+                "password": password,
+                "grant_type": "password",
+            },
+        )
+
+        try:
+            res = load_json(response)
+            token = res.get("access_token")
+            user_info = res.get("user", {})
+            if isinstance(user_info, dict):
+                inet_id = user_info.get("id")
+        except Exception:
             return False, None, None
 
+        return True, token, inet_id
+
+    except httpx.HTTPStatusError as e:
+        logger.warning(
+            f"Failed to verify credentials for user {login}, status code: {e.response.status_code}"
+        )
+        return False, None, None
+
+    except CircuitOpenError as e:
+        logger.warning(str(e))
+        return False, None, None
+
     except httpx.RequestError:
         return False, None, None
 
@@ -1,10 +1,22 @@
-from datetime import date, datetime, timedelta
+from datetime import date, timedelta
 
+WEEKDAY_NAMES = (
+    "Monday",
+    "Tuesday",
+    "Wednesday",
+    "Thursday",
+    "Friday",
+    "Saturday",
+    "Sunday",
+)
 
-def get_day_name(date_str: str) -> str:
-    dt = datetime.strptime(date_str.split("T")[0], "%Y-%m-%d")
-    dt += timedelta(days=1)
-    return dt.strftime("%A").capitalize()
+
+# В INET стоит UTC:19:000 — lessons are dated 19:00 UTC of the previous day.
+INET_DATE_SHIFT = timedelta(days=1)
+
+
+def get_lesson_date(schedule_date: str) -> date:
+    return date.fromisoformat(schedule_date[:10]) + INET_DATE_SHIFT
 
 
 def get_week_range():
@@ -0,0 +1,145 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator
+import httpx
+import ijson
+import orjson
+from app.config import TIMETABLE_HEADERS
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = {502, 503}
+RETRY_ATTEMPTS = 3
+RETRY_BACKOFF = 1.0
+RETRY_BACKOFF_MAX = 5.0
+
+BREAKER_THRESHOLD = 3
+BREAKER_COOLDOWN = 30.0
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+@dataclass
+class CircuitBreaker:
+    threshold: int = BREAKER_THRESHOLD
+    cooldown: float = BREAKER_COOLDOWN
+    failures: int = 0
+    open_until: float = 0.0
+
+    @property
+    def is_open(self) -> bool:
+        return self.open_until > time.monotonic()
+
+    def record_success(self):
+        self.failures = 0
+        self.open_until = 0.0
+
+    def record_failure(self):
+        self.failures += 1
+        if self.failures >= self.threshold:
+            self.open_until = time.monotonic() + self.cooldown
+            logger.warning(
+                f"MDIS API failed {self.failures} times in a row, pausing calls for {self.cooldown}s"
+            )
+
+
+breaker = CircuitBreaker()
+
+client = httpx.AsyncClient(
+    headers=TIMETABLE_HEADERS,
+    http2=True,
+    timeout=httpx.Timeout(10.0),
+    limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+)
+
+
+def auth_headers(token: str) -> dict[str, str]:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def load_json(response: httpx.Response) -> dict:
+    return orjson.loads(response.content)
+
+
+async def _send(method: str, url: str, stream: bool, **kwargs) -> httpx.Response:
+    if breaker.is_open:
+        raise CircuitOpenError(f"MDIS API calls paused, skipping {method} {url}")
+
+    for attempt in range(RETRY_ATTEMPTS):
+        last_attempt = attempt == RETRY_ATTEMPTS - 1
+        try:
+            response = await client.send(
+                client.build_request(method, url, **kwargs), stream=stream
+            )
+        except httpx.TransportError as e:
+            if last_attempt:
+                breaker.record_failure()
+                raise
+            reason = type(e).__name__
+        else:
+            if response.status_code not in RETRY_STATUSES or last_attempt:
+                break
+            reason = response.status_code
+            await response.aclose()
+
+        delay = min(RETRY_BACKOFF * 2**attempt, RETRY_BACKOFF_MAX)
+        logger.warning(f"{method} {url} failed ({reason}), retrying in {delay}s")
+        await asyncio.sleep(delay)
+
+    if response.status_code >= 500:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+    if not response.is_success:
+        await response.aclose()
+        response.raise_for_status()
+    return response
+
+
+async def request(method: str, url: str, **kwargs) -> httpx.Response:
+    return await _send(method, url, stream=False, **kwargs)
+
+
+@asynccontextmanager
+async def stream(method: str, url: str, **kwargs) -> AsyncIterator[httpx.Response]:
+    response = await _send(method, url, stream=True, **kwargs)
+    try:
+        yield response
+    finally:
+        await response.aclose()
+
+
+# Adapts a streamed httpx body to the async file-like reader ijson expects.
+class _ResponseReader:
+    def __init__(self, response: httpx.Response):
+        self._chunks = response.aiter_bytes()
+        self._buffer = b""
+
+    async def read(self, size: int = -1) -> bytes:
+        # ijson probes with read(0) to detect bytes vs text; don't consume a chunk.
+        if size == 0:
+            return b""
+        if not self._buffer:
+            self._buffer = await anext(self._chunks, b"")
+        if size < 0:
+            data, self._buffer = self._buffer, b""
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+async def iter_json_items(
+    response: httpx.Response, prefix: str
+) -> AsyncIterator[dict]:
+    items = ijson.items_async(_ResponseReader(response), prefix, use_float=True)
+    async for item in items:
+        yield item
+
+
+async def close_client():
+    await client.aclose()
@@ -1,7 +1,9 @@
+import asyncio
 import logging
 import random
 from aiogram import Bot
-from datetime import datetime, timedelta, date, time
+from aiogram.exceptions import TelegramRetryAfter
+from datetime import datetime, date, time
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
@@ -9,12 +11,59 @@ from app.db.crud.schedule import (
     get_students_by_group_with_digest,
     get_all_group_schedules_today,
 )
+from app.config import CAMPUS_TZ
 from app.lexicon.lexicon import LEXICON_MSG
 from app.db.crud.user import get_user_language
+from app.utils.cache import BoundedCache
 
 logger = logging.getLogger(__name__)
 
-notified_set: set[tuple[int, str, str]] = set()
+
+# Reminders already sent today, keyed by (user_id, module, action) and capped at maxsize.
+class NotifiedStore:
+    def __init__(self, maxsize: int = 50_000):
+        self.day: date | None = None
+        self._keys = BoundedCache(maxsize=maxsize)
+
+    def start_day(self, day: date):
+        if day != self.day:
+            self.day = day
+            self._keys.clear()
+
+    def __contains__(self, key: tuple[int, str, str]) -> bool:
+        return key in self._keys
+
+    def add(self, key: tuple[int, str, str]):
+        self._keys.set(key, True)
+
+
+notified_store = NotifiedStore()
+
+# Telegram Bot API allows roughly 30 messages per second across all chats.
+SEND_RATE = 30
+# Sends allowed in flight at once; the rate itself is enforced by SendRateLimiter.
+SEND_CONCURRENCY = 30
+
+
+# Spaces sends at least 1/rate seconds apart across all chats.
+class SendRateLimiter:
+    def __init__(self, rate: float = SEND_RATE):
+        self.interval = 1 / rate
+        self._next_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            delay = self._next_at - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._next_at = max(self._next_at, loop.time()) + self.interval
+
+    def pause(self, seconds: float):
+        # Telegram flood control is global, so hold back every pending send.
+        resume_at = asyncio.get_running_loop().time() + seconds
+        self._next_at = max(self._next_at, resume_at)
 
 REMINDER_TIMES = [
     (time(9, 35), "entry"),
@@ -31,80 +80,104 @@ REMINDER_TIMES = [
     (time(18, 25), "exit"),
 ]
 
-
-def parse_time(t: str) -> time:
-    try:
-        return datetime.strptime(t, "%H:%M:%S").time()
-    except ValueError as e:
-        logger.error(f"Failed to parse time {t}: {e}")
-        return None
+ACTIVE_MINUTES = {(t.hour, t.minute) for t, _ in REMINDER_TIMES}
 
 
 async def get_lessons_to_check(
-    group_id: int, schedule_data: list[dict], current_time: datetime
+    group_id: int,
+    schedule_data: list[dict],
+    current_time: datetime,
+    students: list[int],
 ) -> list[dict]:
     result = []
-    now = current_time.time()
-    today_str = (current_time.date() - timedelta(days=1)).isoformat()
-
-    for lesson in schedule_data:
-        if lesson.get("scheduleStatus") != "ACTIVE":
-            continue
-
-        if lesson.get("scheduleDate", "")[:10] != today_str:
-            continue
-
-        if group_id is None:
-            logger.warning(f"Lesson {lesson.get('moduleName')} has no group_id")
-            continue
-
-        students = await get_students_by_group_with_digest(group_id)
-        if not students:
-            logger.debug(f"No students with digest enabled for group_id={group_id}")
-            continue
-
-        if not lesson.get("checkIn"):
-            checkin_end = parse_time(lesson["checkinEnd"])
-            if checkin_end is None:
-                continue
-            window_start = (
-                datetime.combine(date.today(), checkin_end) - timedelta(minutes=5)
-            ).time()
-            if window_start <= now <= checkin_end:
-                result.append({"lesson": lesson, "type": "entry", "students": students})
-                logger.debug(
-                    f"Added entry check for {lesson['moduleName']} at {checkin_end}"
-                )
 
-        if not lesson.get("checkOut"):
-            checkout_end = parse_time(lesson["checkoutEnd"])
-            if checkout_end is None:
-                continue
-            window_start = (
-                datetime.combine(date.today(), checkout_end) - timedelta(minutes=5)
-            ).time()
-            if window_start <= now <= checkout_end:
-                result.append({"lesson": lesson, "type": "exit", "students": students})
-                logger.debug(
-                    f"Added exit check for {lesson['moduleName']} at {checkout_end}"
-                )
+    if group_id is None:
+        logger.warning("Skipping schedule without group_id")
+        return result
+
+    if not students:
+        logger.debug(f"No students with digest enabled for group_id={group_id}")
+        return result
+
+    for entry in schedule_data:
+        result.append({**entry, "students": students})
+        logger.debug(
+            f"Added {entry['type']} check for {entry['lesson']['moduleName']} at {current_time}"
+        )
 
     return result
 
 
-async def check_lesson_marks(bot: Bot):
+async def send_lesson_notification(
+    bot: Bot,
+    semaphore: asyncio.Semaphore,
+    limiter: SendRateLimiter,
+    user_id: int,
+    text: str,
+    key: tuple[int, str, str],
+    notified: NotifiedStore,
+):
+    async with semaphore:
+        for attempt in range(2):
+            await limiter.wait()
+            try:
+                await bot.send_message(user_id, text)
+                logger.info(f"Sent notification to user {user_id}: {text}")
+                notified.add(key)
+                return
+            except TelegramRetryAfter as e:
+                if attempt:
+                    logger.error(
+                        f"Rate limited again sending to user {user_id}, giving up"
+                    )
+                    return
+                logger.warning(
+                    f"Rate limited sending to user {user_id}, retrying in {e.retry_after}s"
+                )
+                limiter.pause(e.retry_after)
+                await asyncio.sleep(e.retry_after)
+            except Exception as e:
+                logger.error(
+                    f"Failed to send notification to user {user_id}: {str(e)}",
+                    exc_info=True,
+                )
+                return
+
+
+async def check_lesson_marks(bot: Bot, notified: NotifiedStore = notified_store):
     try:
-        now = datetime.now()
-        today = date.today()
+        now = datetime.now(tz=CAMPUS_TZ)
+        if (now.hour, now.minute) not in ACTIVE_MINUTES:
+            return
+
+        today = now.date()
+        notified.start_day(today)
         logger.info(f"Starting lesson check at {now}")
 
-        group_schedules = await get_all_group_schedules_today(today)
+        group_schedules = await get_all_group_schedules_today(today, now.time())
         if not group_schedules:
-            logger.warning(f"No schedules found for {today}")
+            logger.info(f"No lesson checks due at {now}")
             return
 
-        for group_id, schedule_data in group_schedules.items():
-            lessons_to_check = await get_lessons_to_check(group_id, schedule_data, now)
+        group_ids = list(group_schedules)
+        students_map = dict(
+            zip(
+                group_ids,
+                await asyncio.gather(
+                    *(get_students_by_group_with_digest(g) for g in group_ids)
+                ),
+            )
+        )
+        results = await asyncio.gather(
+            *(
+                get_lessons_to_check(g, s, now, students_map[g])
+                for g, s in group_schedules.items()
+            )
+        )
+
+        notifications = []
+        queued = set()
+        for group_id, lessons_to_check in zip(group_ids, results):
             logger.info(
                 f"Found {len(lessons_to_check)} lessons to check for group_id={group_id}"
             )
@@ -113,63 +186,63 @@ async def check_lesson_marks(bot: Bot):
                 lesson = entry["lesson"]
                 students = entry["students"]
                 action_type = entry["type"]
+                module = lesson["moduleName"]
+                templates = LEXICON_MSG[f"lesson_check_{action_type}"]
+                time_str = (
+                    lesson["startTime"] if action_type == "entry" else lesson["endTime"]
+                )[:-3]
 
                 for user_id in students:
-                    key = (user_id, lesson["moduleName"], action_type)
-                    if key in notified_set:
+                    key = (user_id, module, action_type)
+                    if key in notified or key in queued:
                         logger.debug(
-                            f"Already notified user {user_id} for {lesson['moduleName']} {action_type}"
+                            f"Already notified user {user_id} for {module} {action_type}"
                         )
                         continue
 
                     lang = await get_user_language(user_id) or "en"
+                    text = random.choice(templates[lang]).format(module, time_str)
 
-                    if action_type == "entry":
-                        text_template = random.choice(
-                            LEXICON_MSG["lesson_check_entry"][lang]
-                        )
-                        text = text_template.format(
-                            lesson["moduleName"], lesson["startTime"][:-3]
-                        )
-                    else:
-                        text_template = random.choice(
-                            LEXICON_MSG["lesson_check_exit"][lang]
-                        )
-                        text = text_template.format(
-                            lesson["moduleName"], lesson["endTime"][:-3]
-                        )
+                    queued.add(key)
+                    notifications.append((user_id, text, key))
 
-                    try:
-                        await bot.send_message(user_id, text)
-                        logger.info(f"Sent notification to user {user_id}: {text}")
-                        notified_set.add(key)
-                    except Exception as e:
-                        logger.error(
-                            f"Failed to send notification to user {user_id}: {str(e)}",
-                            exc_info=True,
-                        )
-                        continue
+        semaphore = asyncio.Semaphore(SEND_CONCURRENCY)
+        limiter = SendRateLimiter()
+        await asyncio.gather(
+            *(
+                send_lesson_notification(
+                    bot, semaphore, limiter, user_id, text, key, notified
+                )
+                for user_id, text, key in notifications
+            )
+        )
 
     except Exception as e:
         logger.error(f"Error in check_lesson_marks: {str(e)}", exc_info=True)
 
 
+def build_lesson_check_trigger() -> CronTrigger:
+    minutes = ",".join(str(m) for m in sorted({m for _, m in ACTIVE_MINUTES}))
+    hours = f"{min(h for h, _ in ACTIVE_MINUTES)}-{max(h for h, _ in ACTIVE_MINUTES)}"
+    return CronTrigger(
+        minute=minutes, hour=hours, day_of_week="mon-sat", timezone=CAMPUS_TZ
+    )
+
+
 def setup_lesson_check_scheduler(bot: Bot):
     try:
-        scheduler = AsyncIOScheduler(timezone="UTC")
+        scheduler = AsyncIOScheduler(timezone=CAMPUS_TZ)
         logger.info("Setting up lesson check scheduler")
 
-        for t, label in REMINDER_TIMES:
-            scheduler.add_job(
-                check_lesson_marks,
-                trigger=CronTrigger(
-                    hour=t.hour, minute=t.minute, day_of_week="mon-sat"
-                ),
-                args=[bot],
-                id=f"lesson_check_{t.hour}_{t.minute}_{label}",
-                replace_existing=True,
-            )
-            logger.info(f"Added job for {t.hour}:{t.minute} ({label})")
+        trigger = build_lesson_check_trigger()
+        scheduler.add_job(
+            check_lesson_marks,
+            trigger=trigger,
+            args=[bot],
+            id="lesson_check",
+            replace_existing=True,
+        )
+        logger.info(f"Added lesson check job with trigger {trigger}")
 
         scheduler.start()
         logger.info("Lesson check scheduler started successfully")
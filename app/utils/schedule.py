@@ -1,35 +1,112 @@
+import hashlib
 import logging
+from operator import itemgetter
+from types import SimpleNamespace
 from typing import Optional
 from datetime import date, timedelta
-from collections import defaultdict
 import httpx
-from app.config import TIMETABLE_HEADERS
+from app.utils.http import (
+    CircuitOpenError,
+    auth_headers,
+    iter_json_items,
+    load_json,
+    request,
+    stream,
+)
 from app.lexicon.lexicon import LEXICON_MSG
-from app.utils.date_utils import get_day_name
+from app.utils.cache import BoundedCache
+from app.utils.date_utils import WEEKDAY_NAMES, get_lesson_date
 from app.db.crud.user import get_attendance_data
 
 logger = logging.getLogger(__name__)
 
+WINDOW_SECONDS = 300
+
+# Sunday has no classes and is never rendered.
+WEEKDAYS = WEEKDAY_NAMES[:6]
+
+TXT = {
+    lang: SimpleNamespace(
+        days=tuple(names[day] for day in WEEKDAYS),
+        classroom=LEXICON_MSG["classroom"][lang],
+        teacher=LEXICON_MSG["teacher"][lang],
+        no_classes=LEXICON_MSG["no_classes"][lang],
+        no_absences=LEXICON_MSG["no_absences"][lang],
+        seminar_hours=LEXICON_MSG["seminar_hours"][lang],
+        lecture_hours=LEXICON_MSG["lecture_hours"][lang],
+        absences=LEXICON_MSG["absences"][lang],
+    )
+    for lang, names in LEXICON_MSG["days"].items()
+}
+
+SCHEDULE_FIELDS = (
+    "scheduleDate",
+    "startTime",
+    "endTime",
+    "moduleName",
+    "venueName",
+    "lecturerName",
+    "lessonTypeName",
+    "scheduleStatus",
+    "checkinEnd",
+    "checkoutEnd",
+)
+
+SORT_KEY = itemgetter("_sort")
+
+CHECK_WINDOW_FIELDS = (
+    ("checkinEnd", "checkinEndSeconds"),
+    ("checkoutEnd", "checkoutEndSeconds"),
+)
+
+
+# Rendered schedule text per (group, week, day, lang), invalidated by content hash.
+class RenderedScheduleCache:
+    def __init__(self, maxsize: int = 1024, ttl: float = 24 * 3600):
+        self._items = BoundedCache(maxsize=maxsize, ttl=ttl)
+
+    @staticmethod
+    def digest(raw: str) -> str:
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    def get(self, key: tuple, digest: str) -> Optional[str]:
+        item = self._items.get(key)
+        if not item:
+            return None
+        cached_digest, text = item
+        if cached_digest != digest:
+            self._items.pop(key)
+            return None
+        return text
+
+    def set(self, key: tuple, digest: str, text: str):
+        self._items.set(key, (digest, text))
+
+
+rendered_schedules = RenderedScheduleCache()
+
 
 async def get_token(login: str, password: str) -> Optional[str]:
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "https://inet.mdis.uz/oauth/tocken",
-                headers=TIMETABLE_HEADERS,
-                data={
-                    "username": login,
-                    "password": password,
-                    "grant_type": "password",
-                },
-            )
-            if response.status_code == 200:
-                logger.info(f"Successfully obtained token for user {login}")
-                return response.json().get("access_token")
-            logger.warning(
-                f"Failed to obtain token for user {login}, status code: {response.status_code}"
-            )
-            return None
+        response = await request(
+            "POST",
+            "https://inet.mdis.uz/oauth/tocken",
+            data={
+                "username": login,
+                "password": password,
+                "grant_type": "password",
+            },
+        )
+        logger.info(f"Successfully obtained token for user {login}")
+        return load_json(response).get("access_token")
+    except httpx.HTTPStatusError as e:
+        logger.warning(
+            f"Failed to obtain token for user {login}, status code: {e.response.status_code}"
+        )
+        return None
+    except CircuitOpenError as e:
+        logger.warning(str(e))
+        return None
     except Exception as e:
         logger.error(f"Error obtaining token for user {login}: {str(e)}", exc_info=True)
         return None
@@ -37,21 +114,22 @@ async def get_token(login: str, password: str) -> Optional[str]:
 
 async def fetch_user_data(token: str, inet_id: str) -> list:
     try:
-        headers = TIMETABLE_HEADERS.copy()
-        headers["Authorization"] = f"Bearer {token}"
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"https://inet.mdis.uz/api/v1/education/view/students?selfId={inet_id}",
-                headers=headers,
-            )
-            if response.status_code == 200:
-                data = response.json().get("data", [])
-                logger.info(f"Successfully fetched user data for inet_id {inet_id}")
-                return data
-            logger.warning(
-                f"Failed to fetch user data for inet_id {inet_id}, status code: {response.status_code}"
-            )
-            return []
+        response = await request(
+            "GET",
+            f"https://inet.mdis.uz/api/v1/education/view/students?selfId={inet_id}",
+            headers=auth_headers(token),
+        )
+        data = load_json(response).get("data", [])
+        logger.info(f"Successfully fetched user data for inet_id {inet_id}")
+        return data
+    except httpx.HTTPStatusError as e:
+        logger.warning(
+            f"Failed to fetch user data for inet_id {inet_id}, status code: {e.response.status_code}"
+        )
+        return []
+    except CircuitOpenError as e:
+        logger.warning(str(e))
+        return []
     except Exception as e:
         logger.error(
             f"Error fetching user data for inet_id {inet_id}: {str(e)}", exc_info=True
@@ -61,21 +139,23 @@ async def fetch_user_data(token: str, inet_id: str) -> list:
 
 async def fetch_schedule_data(token: str, start: date, end: date) -> list:
     try:
-        headers = TIMETABLE_HEADERS.copy()
-        headers["Authorization"] = f"Bearer {token}"
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"https://inet.mdis.uz/api/v1/education/student/view/schedules?from={start}&to={end}",
-                headers=headers,
-            )
-            if response.status_code == 200:
-                data = response.json().get("data", [])
-                logger.info(f"Successfully fetched schedule data from {start} to {end}")
-                return data
-            logger.warning(
-                f"Failed to fetch schedule data from {start} to {end}, status code: {response.status_code}"
-            )
-            return []
+        url = f"https://inet.mdis.uz/api/v1/education/student/view/schedules?from={start}&to={end}"
+        # Sanitize while parsing so the full API payload is never held in memory.
+        async with stream("GET", url, headers=auth_headers(token)) as response:
+            data = [
+                sanitize_lesson(item)
+                async for item in iter_json_items(response, "data.item")
+            ]
+        logger.info(f"Successfully fetched schedule data from {start} to {end}")
+        return data
+    except httpx.HTTPStatusError as e:
+        logger.warning(
+            f"Failed to fetch schedule data from {start} to {end}, status code: {e.response.status_code}"
+        )
+        return []
+    except CircuitOpenError as e:
+        logger.warning(str(e))
+        return []
     except Exception as e:
         logger.error(
             f"Error fetching schedule data from {start} to {end}: {str(e)}",
@@ -84,44 +164,44 @@ async def fetch_schedule_data(token: str, start: date, end: date) -> list:
         return []
 
 
-async def format_schedule(data: list, lang: str = "en") -> str:
+def format_schedule(data: list, lang: str = "en") -> str:
+    t = TXT[lang]
     if not data:
-        return LEXICON_MSG["no_classes"][lang]
+        return t.no_classes
 
-    data.sort(key=lambda x: (x["scheduleDate"], x["startTime"]))
-    grouped = defaultdict(list)
+    try:
+        data.sort(key=SORT_KEY)
+    except KeyError:
+        # Cached before the sort key was stored.
+        data.sort(key=lambda x: (x["scheduleDate"], x["startTime"]))
+    buckets = [[] for _ in range(7)]
 
     for lesson in data:
-        day_name = get_day_name(lesson["scheduleDate"])
+        if "lessonDate" not in lesson:
+            add_lesson_date(lesson)
+        weekday = date.fromisoformat(lesson["lessonDate"]).weekday()
         time = f"{lesson['startTime'][:-3]}–{lesson['endTime'][:-3]}"
-        subject = lesson["moduleName"]
-        venue = lesson["venueName"]
-        lecturer = lesson["lecturerName"]
-        lesson_type = lesson["lessonTypeName"]
-        schedule_status = lesson["scheduleStatus"]
-
-        lesson_text = ()
-
-        if schedule_status == "ACTIVE":
-            lesson_text = (
-                f"🕐 {time} — {subject} ({lesson_type})\n"
-                f"🏫 {LEXICON_MSG['classroom'][lang]}: {venue}\n"
-                f"👨‍🏫 {LEXICON_MSG['teacher'][lang]}: {lecturer}\n"
+        header = f"🕐 {time} — {lesson['moduleName']} ({lesson['lessonTypeName']})"
+
+        if lesson["scheduleStatus"] == "ACTIVE":
+            buckets[weekday].append(
+                f"{header}\n"
+                f"🏫 {t.classroom}: {lesson['venueName']}\n"
+                f"👨‍🏫 {t.teacher}: {lesson['lecturerName']}\n"
             )
         else:
-            lesson_text = (
+            buckets[weekday].append(
                 f"🟥 CANCELED 🟥\n"
-                f"<del>🕐 {time} — {subject} ({lesson_type})</del>\n"
-                f"<del>🏫 {LEXICON_MSG['classroom'][lang]}: {venue}</del>\n"
-                f"<del>👨‍🏫 {LEXICON_MSG['teacher'][lang]}: {lecturer}</del>\n"
+                f"<del>{header}</del>\n"
+                f"<del>🏫 {t.classroom}: {lesson['venueName']}</del>\n"
+                f"<del>👨‍🏫 {t.teacher}: {lesson['lecturerName']}</del>\n"
             )
-        grouped[day_name].append(lesson_text)
 
     final_lines = []
-    for day in ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]:
-        if day in grouped:
-            final_lines.append(f"📅 <b>{LEXICON_MSG['days'][lang][day]}</b>")
-            final_lines.extend(grouped[day])
+    for weekday in range(6):
+        if buckets[weekday]:
+            final_lines.append(f"📅 <b>{t.days[weekday]}</b>")
+            final_lines.extend(buckets[weekday])
             final_lines.append("")
 
     return "\n".join(final_lines)
@@ -130,23 +210,22 @@ async def format_schedule(data: list, lang: str = "en") -> str:
 async def fetch_attendance_data(telegram_id: int, token: str) -> list:
     try:
         inet_id, semester_id = await get_attendance_data(telegram_id)
-        headers = TIMETABLE_HEADERS.copy()
-        headers["Authorization"] = f"Bearer {token}"
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"https://inet.mdis.uz/api/v1/education/students/attendances?page=0&perPage=10&direction=ASC&sortBy=id&semesterId={semester_id}&studentId={inet_id}",
-                headers=headers,
-            )
-            if response.status_code == 200:
-                data = response.json().get("data", [])
-                logger.info(
-                    f"Successfully fetched attendance data for user {telegram_id}"
-                )
-                return data
-            logger.warning(
-                f"Failed to fetch attendance data for user {telegram_id}, status code: {response.status_code}"
-            )
-            return []
+        response = await request(
+            "GET",
+            f"https://inet.mdis.uz/api/v1/education/students/attendances?page=0&perPage=10&direction=ASC&sortBy=id&semesterId={semester_id}&studentId={inet_id}",
+            headers=auth_headers(token),
+        )
+        data = load_json(response).get("data", [])
+        logger.info(f"Successfully fetched attendance data for user {telegram_id}")
+        return data
+    except httpx.HTTPStatusError as e:
+        logger.warning(
+            f"Failed to fetch attendance data for user {telegram_id}, status code: {e.response.status_code}"
+        )
+        return []
+    except CircuitOpenError as e:
+        logger.warning(str(e))
+        return []
     except Exception as e:
         logger.error(
             f"Error fetching attendance data for user {telegram_id}: {str(e)}",
@@ -156,8 +235,9 @@ async def fetch_attendance_data(telegram_id: int, token: str) -> list:
 
 
 def format_attendance(data: list, lang: str = "ru") -> str:
+    t = TXT[lang]
     if not data:
-        return LEXICON_MSG["no_absences"][lang]
+        return t.no_absences
 
     final_lines = []
     data.sort(key=lambda x: x["name"])
@@ -179,28 +259,50 @@ def format_attendance(data: list, lang: str = "ru") -> str:
 
         line = (
             f"{emoji} <b>{subject}</b> ({code})\n"
-            f"🧑‍🏫 {LEXICON_MSG['seminar_hours'][lang]}: {seminar_hours} | {LEXICON_MSG['lecture_hours'][lang]}: {lecture_hours}\n"
-            f"❌ {LEXICON_MSG['absences'][lang]}: {absent_count} ({attendance_percent}%)\n"
+            f"🧑‍🏫 {t.seminar_hours}: {seminar_hours} | {t.lecture_hours}: {lecture_hours}\n"
+            f"❌ {t.absences}: {absent_count} ({attendance_percent}%)\n"
         )
         final_lines.append(line)
 
     return "\n".join(final_lines)
 
 
-def sanitize_schedule_data(data: list[dict]) -> list[dict]:
-    needed_fields = [
-        "scheduleDate",
-        "startTime",
-        "endTime",
-        "moduleName",
-        "venueName",
-        "lecturerName",
-        "lessonTypeName",
-        "scheduleStatus",
-        "checkinEnd",
-        "checkoutEnd",
-    ]
-    return [{key: item[key] for key in needed_fields if key in item} for item in data]
+def sanitize_lesson(item: dict) -> dict:
+    lesson = {key: item.get(key) for key in SCHEDULE_FIELDS}
+    # Both parts are fixed-width ISO strings, so lexical order is chronological.
+    lesson["_sort"] = f"{lesson['scheduleDate'] or ''}{lesson['startTime'] or ''}"
+    add_check_windows(lesson)
+    add_lesson_date(lesson)
+    return lesson
+
+
+def add_lesson_date(item: dict) -> dict:
+    try:
+        item["lessonDate"] = get_lesson_date(item["scheduleDate"]).isoformat()
+    except (KeyError, TypeError, ValueError):
+        pass
+    return item
+
+
+def add_check_windows(item: dict) -> dict:
+    for source, target in CHECK_WINDOW_FIELDS:
+        try:
+            hours, minutes, seconds = map(int, item[source].split(":"))
+        except (KeyError, AttributeError, ValueError):
+            continue
+        item[target] = hours * 3600 + minutes * 60 + seconds
+    return item
+
+
+def lessons_on(data: list[dict], day: date) -> list[dict]:
+    day_str = day.isoformat()
+    result = []
+    for lesson in data:
+        if "lessonDate" not in lesson:
+            add_lesson_date(lesson)
+        if lesson.get("lessonDate") == day_str:
+            result.append(lesson)
+    return result
 
 
 def get_week_start(date_: date) -> date:
@@ -11,8 +11,9 @@ from app.utils.schedule import (
     fetch_schedule_data,
     get_token,
     format_schedule,
-    sanitize_schedule_data,
+    lessons_on,
 )
+from app.utils.date_utils import INET_DATE_SHIFT
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
@@ -22,8 +23,9 @@ import json
 
 
 async def send_today_schedule_digest(bot: Bot):
-    today = date.today() - timedelta(days=1)
-    monday = today - timedelta(days=today.weekday())
+    today = date.today()
+    inet_today = today - INET_DATE_SHIFT
+    monday = inet_today - timedelta(days=inet_today.weekday())
     sunday = monday + timedelta(days=6)
 
     users = await get_users_with_today_digest()
@@ -44,28 +46,20 @@ async def send_today_schedule_digest(bot: Bot):
             token = await get_token(login, password)
             if not token:
                 continue
-            data = await fetch_schedule_data(token, monday, sunday)
-            if not data:
+            cleaned = await fetch_schedule_data(token, monday, sunday)
+            if not cleaned:
                 continue
-            cleaned = sanitize_schedule_data(data)
             await save_schedule_to_cache(group_id, monday, json.dumps(cleaned))
         else:
             cleaned = json.loads(cached.data)
 
-        today_data = [
-            item
-            for item in cleaned
-            if datetime.fromisoformat(
-                item["scheduleDate"].replace("+0000", "+00:00")
-            ).date()
-            == today
-        ]
+        today_data = lessons_on(cleaned, today)
         if not today_data:
             continue
 
         for telegram_id, lang in student_list:
             try:
-                text = await format_schedule(today_data, lang)
+                text = format_schedule(today_data, lang)
                 logging.info(f"{telegram_id}, {text}")
                 if text in LEXICON_MSG["no_classes"].values():
                     await bot.send_message(telegram_id, text)
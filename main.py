@@ -14,6 +14,7 @@ from app.middleware.ignore_groups import IgnoreGroupChatsMiddleware
 from app.middleware.language import LanguageMiddleware
 from app.utils.lesson_check import setup_lesson_check_scheduler
 from app.utils.schedule_check import setup_digest_scheduler
+from app.utils.http import close_client
 
 logger = logging.getLogger(__name__)
 
@@ -49,6 +50,7 @@ async def main():
     finally:
         logger.info("Shutting down bot...")
         await bot.session.close()
+        await close_client()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,6 @@
+import os
+
+# app.config builds Settings() at import time.
+os.environ.setdefault("TOKEN", "test")
+os.environ.setdefault("DATABASE_URL", "postgresql://test")
+os.environ.setdefault("FERNET_KEY", "A" * 43 + "=")
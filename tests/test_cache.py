@@ -0,0 +1,37 @@
+from app.utils import cache
+from app.utils.cache import BoundedCache
+
+
+def test_bounded_cache_evicts_least_recently_used():
+    items = BoundedCache(maxsize=2)
+    items.set("a", 1)
+    items.set("b", 2)
+    assert items.get("a") == 1
+    items.set("c", 3)
+
+    assert "a" in items
+    assert "b" not in items
+    assert "c" in items
+
+
+def test_bounded_cache_refresh_does_not_evict_others():
+    items = BoundedCache(maxsize=2)
+    items.set("a", 1)
+    items.set("b", 2)
+    items.set("a", 10)
+
+    assert items.get("a") == 10
+    assert items.get("b") == 2
+
+
+def test_bounded_cache_expires_entries(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    items = BoundedCache(maxsize=10, ttl=60)
+    items.set("a", 1)
+
+    now[0] += 59
+    assert items.get("a") == 1
+    now[0] += 1
+    assert items.get("a") is None
+    assert len(items) == 0
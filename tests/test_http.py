@@ -0,0 +1,125 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.utils import http
+from app.utils.http import CircuitBreaker, CircuitOpenError, iter_json_items
+
+URL = "https://inet.mdis.uz/test"
+
+
+async def _chunked(body: bytes, size: int):
+    for i in range(0, len(body), size):
+        yield body[i : i + size]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 10, 10_000])
+def test_iter_json_items_reads_multi_chunk_body(chunk_size):
+    lessons = [{"moduleName": f"Module {i}", "startTime": "09:40:00"} for i in range(5)]
+    body = json.dumps({"data": lessons}).encode()
+
+    def handler(request):
+        return httpx.Response(200, content=_chunked(body, chunk_size))
+
+    async def collect():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            async with client.stream("GET", URL) as response:
+                return [item async for item in iter_json_items(response, "data.item")]
+
+    assert asyncio.run(collect()) == lessons
+
+
+@pytest.fixture
+def mdis(monkeypatch):
+    calls = []
+    state = {"handler": lambda request: httpx.Response(200, json={})}
+
+    def handler(request):
+        calls.append(request)
+        return state["handler"](request)
+
+    monkeypatch.setattr(
+        http, "client", httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+    monkeypatch.setattr(http, "breaker", CircuitBreaker())
+    monkeypatch.setattr(http, "RETRY_BACKOFF", 0)
+
+    def respond(handler):
+        state["handler"] = handler
+
+    return calls, respond
+
+
+@pytest.mark.parametrize("status", [502, 503])
+def test_retryable_status_is_retried_then_raised(mdis, status):
+    calls, respond = mdis
+    respond(lambda request: httpx.Response(status))
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(http.request("GET", URL))
+
+    assert len(calls) == http.RETRY_ATTEMPTS
+    assert http.breaker.failures == 1
+
+
+def test_retryable_status_recovers(mdis):
+    calls, respond = mdis
+    statuses = iter([503, 200])
+    respond(lambda request: httpx.Response(next(statuses), json={"ok": True}))
+
+    response = asyncio.run(http.request("GET", URL))
+
+    assert http.load_json(response) == {"ok": True}
+    assert len(calls) == 2
+    assert http.breaker.failures == 0
+
+
+def test_transport_error_is_retried_then_counted(mdis):
+    calls, respond = mdis
+
+    def fail(request):
+        raise httpx.ConnectError("boom", request=request)
+
+    respond(fail)
+
+    with pytest.raises(httpx.ConnectError):
+        asyncio.run(http.request("GET", URL))
+
+    assert len(calls) == http.RETRY_ATTEMPTS
+    assert http.breaker.failures == 1
+
+
+def test_breaker_opens_after_threshold_failures(mdis):
+    _, respond = mdis
+    respond(lambda request: httpx.Response(502))
+
+    for _ in range(http.BREAKER_THRESHOLD):
+        with pytest.raises(httpx.HTTPStatusError):
+            asyncio.run(http.request("GET", URL))
+
+    assert http.breaker.is_open
+
+
+def test_open_breaker_makes_no_network_call(mdis):
+    calls, _ = mdis
+    for _ in range(http.BREAKER_THRESHOLD):
+        http.breaker.record_failure()
+
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(http.request("GET", URL))
+
+    assert calls == []
+
+
+def test_client_error_resets_failure_count(mdis):
+    calls, respond = mdis
+    http.breaker.failures = 2
+    respond(lambda request: httpx.Response(404))
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(http.request("GET", URL))
+
+    assert len(calls) == 1
+    assert http.breaker.failures == 0
@@ -0,0 +1,211 @@
+import asyncio
+import json
+from datetime import date, datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import SendMessage
+
+from app.config import CAMPUS_TZ
+from app.db.crud import schedule as schedule_crud
+from app.utils import lesson_check
+from app.utils.lesson_check import (
+    NotifiedStore,
+    SendRateLimiter,
+    build_lesson_check_trigger,
+    check_lesson_marks,
+    send_lesson_notification,
+)
+from app.utils.schedule import sanitize_lesson
+
+LESSON = {
+    "moduleName": "Math",
+    "startTime": "09:40:00",
+    "endTime": "11:00:00",
+    "scheduleStatus": "ACTIVE",
+    "checkinEnd": "09:40:00",
+    "checkoutEnd": "11:00:00",
+}
+
+
+class FakeBot:
+    def __init__(self):
+        self.sent = []
+
+    async def send_message(self, chat_id, text):
+        self.sent.append((chat_id, text))
+
+
+@pytest.fixture
+def fixed_now(monkeypatch):
+    def set_now(value: datetime):
+        class FixedDatetime(datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return value.astimezone(tz) if tz else value
+
+        monkeypatch.setattr(lesson_check, "datetime", FixedDatetime)
+
+    return set_now
+
+
+@pytest.fixture
+def students(monkeypatch):
+    async def get_students(group_id):
+        return [101, 102]
+
+    async def get_language(user_id):
+        return "en"
+
+    monkeypatch.setattr(lesson_check, "get_students_by_group_with_digest", get_students)
+    monkeypatch.setattr(lesson_check, "get_user_language", get_language)
+
+
+def test_notified_store_resets_on_new_day():
+    store = NotifiedStore()
+    store.start_day(date(2026, 10, 14))
+    store.add((101, "Math", "entry"))
+
+    store.start_day(date(2026, 10, 14))
+    assert (101, "Math", "entry") in store
+
+    store.start_day(date(2026, 10, 15))
+    assert (101, "Math", "entry") not in store
+
+
+def test_notified_store_membership_has_no_side_effects():
+    store = NotifiedStore()
+    store.start_day(date(2026, 10, 14))
+    store.add((101, "Math", "entry"))
+
+    assert (102, "Math", "entry") not in store
+    assert (101, "Math", "entry") in store
+
+
+def test_notified_store_evicts_past_maxsize():
+    store = NotifiedStore(maxsize=2)
+    store.start_day(date(2026, 10, 14))
+    store.add((1, "Math", "entry"))
+    store.add((2, "Math", "entry"))
+    store.add((3, "Math", "entry"))
+
+    assert (1, "Math", "entry") not in store
+    assert (2, "Math", "entry") in store
+    assert (3, "Math", "entry") in store
+
+
+def test_second_tick_does_not_resend(monkeypatch, fixed_now, students):
+    async def due_checks(target_date, now):
+        # The same lesson listed twice in one tick must only be queued once.
+        entry = {"lesson": LESSON, "type": "entry"}
+        return {1: [entry, entry]}
+
+    monkeypatch.setattr(lesson_check, "get_all_group_schedules_today", due_checks)
+    fixed_now(datetime(2026, 10, 14, 9, 35, tzinfo=CAMPUS_TZ))
+    bot = FakeBot()
+    store = NotifiedStore()
+
+    asyncio.run(check_lesson_marks(bot, store))
+    asyncio.run(check_lesson_marks(bot, store))
+
+    assert sorted(chat_id for chat_id, _ in bot.sent) == [101, 102]
+
+
+def test_send_rate_limiter_spaces_sends():
+    async def run():
+        limiter = SendRateLimiter(rate=100)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        for _ in range(6):
+            await limiter.wait()
+        return loop.time() - start
+
+    assert asyncio.run(run()) >= 0.05
+
+
+class FloodedBot(FakeBot):
+    def __init__(self, retry_after: float):
+        super().__init__()
+        self.retry_after = retry_after
+        self.sent_at = {}
+
+    async def send_message(self, chat_id, text):
+        if not self.retry_after_raised:
+            self.retry_after_raised = True
+            raise TelegramRetryAfter(
+                method=SendMessage(chat_id=chat_id, text=text),
+                message="Too Many Requests",
+                retry_after=self.retry_after,
+            )
+        self.sent_at[chat_id] = asyncio.get_running_loop().time()
+        await super().send_message(chat_id, text)
+
+    retry_after_raised = False
+
+
+def test_retry_after_pauses_all_sends_and_retries_once():
+    async def run():
+        bot = FloodedBot(retry_after=0.1)
+        semaphore = asyncio.Semaphore(30)
+        limiter = SendRateLimiter(rate=1000)
+        store = NotifiedStore()
+        store.start_day(date(2026, 10, 14))
+        start = asyncio.get_running_loop().time()
+        await asyncio.gather(
+            *(
+                send_lesson_notification(
+                    bot, semaphore, limiter, uid, "text", (uid, "Math", "entry"), store
+                )
+                for uid in (101, 102)
+            )
+        )
+        return bot, store, start
+
+    bot, store, start = asyncio.run(run())
+
+    assert sorted(bot.sent_at) == [101, 102]
+    assert all(sent_at - start >= 0.1 for sent_at in bot.sent_at.values())
+    assert (101, "Math", "entry") in store
+    assert (102, "Math", "entry") in store
+
+
+def test_trigger_fires_in_campus_time():
+    trigger = build_lesson_check_trigger()
+    now = datetime(2026, 10, 14, 4, 30, tzinfo=timezone.utc)
+
+    fire_time = trigger.get_next_fire_time(None, now)
+
+    assert fire_time == datetime(2026, 10, 14, 4, 35, tzinfo=timezone.utc)
+
+
+class FakeSession:
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement):
+        rows = self.rows
+        return SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: rows))
+
+
+def test_local_morning_tick_picks_lesson_by_campus_time(
+    monkeypatch, fixed_now, students
+):
+    # INET stores the Wednesday lesson under 19:00 UTC of Tuesday.
+    lesson = sanitize_lesson({**LESSON, "scheduleDate": "2026-10-13T19:00:00.000Z"})
+    row = SimpleNamespace(group_id=1, data=json.dumps([lesson]))
+    monkeypatch.setattr(schedule_crud, "async_session_maker", lambda: FakeSession([row]))
+    fixed_now(datetime(2026, 10, 14, 9, 35, tzinfo=CAMPUS_TZ))
+    bot = FakeBot()
+    store = NotifiedStore()
+
+    asyncio.run(check_lesson_marks(bot, store))
+
+    assert sorted(chat_id for chat_id, _ in bot.sent) == [101, 102]
+    assert (101, "Math", "entry") in store